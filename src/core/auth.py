@@ -4,8 +4,9 @@ Core authentication logic.
 This module contains the core authentication business logic.
 """
 
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Set, Dict, Any
+from typing import Optional, Set, Dict, Any, Tuple
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -15,7 +16,7 @@ from .models import User, UserCreate, UserLogin, Token, TokenData
 
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 # Token blacklist (in production, use Redis or database)
 BLACKLISTED_TOKENS: Set[str] = set()
@@ -28,6 +29,13 @@ USERS_DB: Dict[str, Dict[str, Any]] = {}
 SECRET_KEY = settings.secret_key
 ALGORITHM = "HS256"
 
+# Decoded-token cache: (signing secret, token) -> (valid_until epoch seconds, username).
+# Keying on the secret means a rotated SECRET_KEY never serves an old decode;
+# the oldest entry is evicted first once the cache is full.
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAXSIZE = 10000
+TOKEN_CACHE: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
@@ -77,17 +85,38 @@ def create_refresh_token(data: dict) -> str:
 
 
 def verify_token(token: str) -> Optional[TokenData]:
-    """Verify and decode a JWT token."""
+    """Verify and decode a JWT token.
+
+    Successful decodes are cached for up to ``TOKEN_CACHE_TTL_SECONDS`` (never
+    past the token's own ``exp``) so repeat requests skip signature checks.
+    """
+    now = time.time()
+    key = (settings.secret_key, token)
+    cached = TOKEN_CACHE.get(key)
+    if cached is not None:
+        valid_until, cached_username = cached
+        if now < valid_until:
+            return TokenData(username=cached_username)
+        TOKEN_CACHE.pop(key, None)
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         username: str = payload.get("sub")
         if username is None:
             return None
         token_data = TokenData(username=username)
-        return token_data
     except jwt.JWTError:
         return None
 
+    valid_until = now + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if exp is not None:
+        valid_until = min(valid_until, float(exp))
+    if len(TOKEN_CACHE) >= TOKEN_CACHE_MAXSIZE:
+        TOKEN_CACHE.pop(next(iter(TOKEN_CACHE)), None)
+    TOKEN_CACHE[key] = (valid_until, username)
+    return token_data
+
 
 def get_current_user(token: str) -> Optional[User]:
     """Get current user from token."""
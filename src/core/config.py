@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(default=30, validation_alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_minutes: int = Field(default=10080, validation_alias="REFRESH_TOKEN_EXPIRE_MINUTES")  # 7 days
     algorithm: str = Field(default="HS256", validation_alias="ALGORITHM")
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, validation_alias="BCRYPT_ROUNDS")
     
     # CORS
     cors_origins: List[str] = Field(default=["*"], validation_alias="CORS_ORIGINS")
@@ -42,12 +43,14 @@ class Settings(BaseSettings):
     # Qdrant
     qdrant_url: str = Field(default="http://localhost:6333", validation_alias="QDRANT_URL")
     qdrant_collection: str = Field(default="rag_chunks", validation_alias="QDRANT_COLLECTION")
+    qdrant_int8_quantization: bool = Field(default=False, validation_alias="QDRANT_INT8_QUANTIZATION")
     
     # Document Processing
     docs_dir: str = Field(default="docs", validation_alias="DOCS_DIR")
     chunk_size: int = Field(default=800, validation_alias="CHUNK_SIZE")
     chunk_overlap: int = Field(default=120, validation_alias="CHUNK_OVERLAP")
     top_k: int = Field(default=6, validation_alias="TOP_K")
+    embed_concurrency: int = Field(default=4, validation_alias="EMBED_CONCURRENCY")
     
     # File Upload
     max_file_size: int = Field(default=10 * 1024 * 1024, validation_alias="MAX_FILE_SIZE")  # 10MB
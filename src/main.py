@@ -8,16 +8,22 @@ from fastapi import FastAPI, UploadFile, File, Request, Depends, HTTPException,
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.security import HTTPBearer
-from typing import List, Dict, Any, Optional, Iterable
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 from pathlib import Path
 from pydantic import BaseModel, Field
 import json
+import math
 import hashlib
 import requests
 import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import Distance, VectorParams, PointStruct
 
+try:  # optional: faster parsing of the per-token Ollama stream lines
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 from .core.config import settings
 from .api.dependencies import get_qdrant_client, get_rag_core
 from .core.di import provide_qdrant_client, provide_rag_core
@@ -30,6 +36,11 @@ COLLECTION = settings.qdrant_collection
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
+# Keep-alive connection pool for the embedding and generation calls to Ollama
+ollama_session = requests.Session()
+ollama_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32))
+ollama_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
 # Request models
 class LoginRequest(BaseModel):
     username: str
@@ -65,14 +76,34 @@ async def get_current_active_user(credentials = Depends(security)) -> User:
 
 # Utility functions (from original implementation)
 def sha1_u64(s: str) -> int:
-    h = hashlib.sha1(s.encode("utf-8", errors="ignore")).digest()
+    h = hashlib.sha1(s.encode("utf-8", errors="ignore"), usedforsecurity=False).digest()
     return int.from_bytes(h[:8], "big", signed=False)
 
+# Query embeddings keyed by (Ollama URL, embedding model, text); oldest entry evicted first
+EMBED_CACHE_MAXSIZE = 4096
+EMBED_CACHE: Dict[Tuple[str, str, str], np.ndarray] = {}
+
 def embed_ollama(text: str) -> np.ndarray:
-    r = requests.post(f"{settings.ollama_url}/api/embeddings", json={"model": settings.emb_model, "prompt": text})
+    """Embed ``text`` with Ollama and L2-normalize it; repeat texts come from EMBED_CACHE.
+
+    The returned array is shared with the cache and is read-only.
+    """
+    key = (settings.ollama_url, settings.emb_model, text)
+    cached = EMBED_CACHE.get(key)
+    if cached is not None:
+        return cached
+    r = ollama_session.post(f"{settings.ollama_url}/api/embeddings", json={"model": settings.emb_model, "prompt": text})
     r.raise_for_status()
-    v = np.array(r.json()["embedding"], dtype="float32")
-    v /= (np.linalg.norm(v) + 1e-12)  # cosine norm
+    emb = r.json()["embedding"]
+    v = np.fromiter(emb, dtype=np.float32, count=len(emb))
+    # cosine norm: one dot-product pass, then an in-place scale by the reciprocal
+    n = float(np.dot(v, v))
+    if n > 0.0:
+        v *= np.float32(1.0 / math.sqrt(n))
+    v.setflags(write=False)
+    if len(EMBED_CACHE) >= EMBED_CACHE_MAXSIZE:
+        EMBED_CACHE.pop(next(iter(EMBED_CACHE)), None)
+    EMBED_CACHE[key] = v
     return v
 
 # System prompt (from original implementation)
@@ -85,21 +116,21 @@ SYS = (
     "When referencing information, mention the source naturally in your response (e.g., 'According to the document...' or 'The source mentions...'). "
     "Be helpful and informative while staying conversational and natural."
 )
+_PROMPT_HEAD = f"{SYS}\n\nContext:\n"
 
 def stream_answer(query: str, ctx_blocks: List[Dict[str, Any]]) -> Iterable[bytes]:
     """Yields text chunks from Ollama's streaming API (exact original implementation)."""
     # Format context more naturally
-    context_parts = []
-    for i, block in enumerate(ctx_blocks):
-        source_info = f"From {block['doc_path']}: " if 'doc_path' in block else ""
-        context_parts.append(f"{source_info}{block['text']}")
-    ctx_str = "\n\n".join(context_parts)
+    ctx_str = "\n\n".join(
+        f"From {block['doc_path']}: {block['text']}" if 'doc_path' in block else f"{block['text']}"
+        for block in ctx_blocks
+    )
     prompt = (
-        f"{SYS}\n\nContext:\n{ctx_str}\n\n"
+        f"{_PROMPT_HEAD}{ctx_str}\n\n"
         f"Question: {query}\n"
         f"Please provide a helpful and informative answer:"
     )
-    with requests.post(
+    with ollama_session.post(
         f"{settings.ollama_url}/api/generate",
         json={"model": settings.gen_model, "prompt": prompt, "stream": True},
         stream=True,
@@ -109,7 +140,7 @@ def stream_answer(query: str, ctx_blocks: List[Dict[str, Any]]) -> Iterable[byte
             if not line:
                 continue
             try:
-                obj = json.loads(line)
+                obj = json_loads(line)
                 if "response" in obj and obj["response"]:
                     yield obj["response"].encode("utf-8")
                 if obj.get("done"):
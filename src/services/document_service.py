@@ -22,8 +22,8 @@ class DocumentService:
         self.chunk_overlap = settings.chunk_overlap
     
     def sha1_u64(self, text: str) -> int:
-        """Convert text to SHA1 hash as uint64."""
-        h = hashlib.sha1(text.encode("utf-8", errors="ignore")).digest()
+        """Convert text to SHA1 hash as uint64 (a point ID, not a security digest)."""
+        h = hashlib.sha1(text.encode("utf-8", errors="ignore"), usedforsecurity=False).digest()
         return int.from_bytes(h[:8], "big", signed=False)
     
     def read_docs(self, datapath: str) -> List[Dict[str, Any]]:
@@ -37,7 +37,8 @@ class DocumentService:
             items = self._read_single_file(p)
         else:
             for file_path in p.rglob("*"):
-                if file_path.is_file() and file_path.suffix.lower() in self.allowed_extensions:
+                # Suffix check first: it is a string test, is_file() is a stat() call
+                if file_path.suffix.lower() in self.allowed_extensions and file_path.is_file():
                     items.extend(self._read_single_file(file_path))
         
         return items
@@ -57,9 +58,7 @@ class DocumentService:
         """Read PDF file."""
         try:
             reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
+            text = "".join(page.extract_text() + "\n" for page in reader.pages)
             
             if text.strip():
                 return [{
@@ -98,13 +97,9 @@ class DocumentService:
         if len(words) <= size:
             return [text] if text.strip() else []
         
-        chunks = []
-        for i in range(0, len(words), size - overlap):
-            chunk = " ".join(words[i:i + size])
-            if chunk.strip():
-                chunks.append(chunk)
-        
-        return chunks
+        # split() never yields empty words and every window starts inside
+        # ``words``, so each joined chunk is already non-blank
+        return [" ".join(words[i:i + size]) for i in range(0, len(words), size - overlap)]
     
     def process_uploaded_files(self, files: List[Any]) -> Dict[str, Any]:
         """Process uploaded files and save them to the documents directory."""
@@ -6,10 +6,13 @@ This service handles embedding generation, vector search, and answer generation.
 
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from typing import List, Dict, Any, Optional, Iterable
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import (
+    Distance, VectorParams, PointStruct, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+)
 
 from ..core.config import settings
 from .embedding_service import EmbeddingService
@@ -35,9 +38,17 @@ class RAGService:
                 existing.remove(self.collection_name)
             
             if self.collection_name not in existing:
+                # Optional int8 scalar quantization: 4x smaller vectors for the search pass,
+                # Qdrant rescoring against the original float32 vectors
+                quantization_config = None
+                if settings.qdrant_int8_quantization:
+                    quantization_config = ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+                    )
                 self.qdrant_client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+                    quantization_config=quantization_config,
                 )
                 print(f"Created collection: {self.collection_name}")
             else:
@@ -51,12 +62,13 @@ class RAGService:
         if not texts:
             raise ValueError("need at least one array to concatenate")
         
-        embeddings: List[List[float]] = []
-        for text in texts:
-            embedding = self.embedding_service.generate_embedding(text)
-            embeddings.append(embedding)
-        
-        return embeddings
+        # Keep several requests in flight so HTTP round-trips overlap with Ollama's inference;
+        # map() preserves input order and re-raises the first failure
+        workers = min(settings.embed_concurrency, len(texts))
+        if workers <= 1:
+            return [self.embedding_service.generate_embedding(text) for text in texts]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.embedding_service.generate_embedding, texts))
     
     def index_documents(self, datapath: str, clear: bool = False) -> Dict[str, Any]:
         """Index documents from a directory into the vector database."""
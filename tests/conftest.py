@@ -3,24 +3,251 @@ Test configuration and fixtures for Mini RAG tests.
 
 This module provides shared fixtures and configuration for all test modules
 in the refactored test structure.
+
+The suite is safe to run in parallel with pytest-xdist
+(``pytest -n auto --dist loadgroup``). Each xdist worker is a separate
+process, so module-level state such as ``BLACKLISTED_TOKENS`` and the
+FastAPI ``app`` is private to the worker; classes marked with
+``xdist_group`` are kept together on one worker. Within a worker, autouse
+fixtures reset the token blacklist, the decoded-token and query-embedding
+caches, ``USERS_DB`` and ``app.dependency_overrides`` around every test.
 """
+import asyncio
 import pytest
-import os
+import pytest_asyncio
 import tempfile
 import shutil
-from unittest.mock import Mock, patch
-from pathlib import Path
-
-# Set test environment variables
-os.environ["OLLAMA_URL"] = "http://localhost:11434"
-os.environ["GEN_MODEL"] = "llama3.1:8b"
-os.environ["EMB_MODEL"] = "nomic-embed-text"
-os.environ["QDRANT_URL"] = "http://localhost:6333"
-os.environ["QDRANT_COLLECTION"] = "test_rag_chunks"
-os.environ["DOCS_DIR"] = "test_docs"
-os.environ["CHUNK_SIZE"] = "800"
-os.environ["CHUNK_OVERLAP"] = "120"
-os.environ["TOP_K"] = "6"
+from unittest.mock import Mock
+
+# Test environment variables
+_TEST_ENV = {
+    "OLLAMA_URL": "http://localhost:11434",
+    "GEN_MODEL": "llama3.1:8b",
+    "EMB_MODEL": "nomic-embed-text",
+    "QDRANT_URL": "http://localhost:6333",
+    "QDRANT_COLLECTION": "test_rag_chunks",
+    "DOCS_DIR": "test_docs",
+    "CHUNK_SIZE": "800",
+    "CHUNK_OVERLAP": "120",
+    "TOP_K": "6",
+    "SECRET_KEY": "test-secret-key",  # matches tests/fixtures/auth_helpers.create_test_token
+    "BCRYPT_ROUNDS": "4",  # minimum bcrypt cost; tests check control flow, not hash strength
+}
+_env_patch = pytest.MonkeyPatch()
+
+def pytest_addoption(parser):
+    """Register the ``--fast`` inner-loop option."""
+    parser.addoption(
+        "--fast", action="store_true", default=False,
+        help="skip tests marked slow (real JWT/bcrypt round-trips)"
+    )
+
+def pytest_configure(config):
+    """Apply the test environment before any test module imports settings."""
+    config.addinivalue_line("markers", "slow: exercises real login/logout crypto; skipped with --fast")
+    for key, value in _TEST_ENV.items():
+        _env_patch.setenv(key, value)
+
+def pytest_collection_modifyitems(config, items):
+    """Run slow tests first under xdist, or skip them when running with ``--fast``.
+
+    Scheduling the slow tests first lets xdist workers start on them while
+    the cheap tests fill the remaining slots. In a serial run the reorder
+    gains nothing and would split module- and class-scoped fixtures, so
+    collection order is left alone.
+    """
+    if not config.getoption("--fast"):
+        if config.getoption("numprocesses", default=None):
+            items.sort(key=lambda item: "slow" not in item.keywords)
+        return
+    skip_slow = pytest.mark.skip(reason="slow test skipped with --fast")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+def pytest_unconfigure(config):
+    """Restore the original environment."""
+    _env_patch.undo()
+
+@pytest.fixture(scope="session")
+def _blacklisted_tokens():
+    """The worker's access and refresh token blacklists, resolved once per session."""
+    from src.core.auth import BLACKLISTED_TOKENS, BLACKLISTED_REFRESH_TOKENS
+    return BLACKLISTED_TOKENS, BLACKLISTED_REFRESH_TOKENS
+
+@pytest.fixture(autouse=True)
+def _clear_blacklist(_blacklisted_tokens):
+    """Start every test with empty token blacklists."""
+    for blacklist in _blacklisted_tokens:
+        blacklist.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def _clear_token_cache():
+    """Start every test with an empty decoded-token cache."""
+    from src.core.auth import TOKEN_CACHE
+    TOKEN_CACHE.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def _clear_embed_cache():
+    """Start every test with an empty query-embedding cache."""
+    from src.main import EMBED_CACHE
+    EMBED_CACHE.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def _restore_users_db():
+    """Undo any ``USERS_DB`` additions, removals or edits made by a test."""
+    from src.core.auth import USERS_DB
+    snapshot = {username: dict(data) for username, data in USERS_DB.items()}
+    yield
+    USERS_DB.clear()
+    USERS_DB.update(snapshot)
+
+@pytest.fixture(scope="session", autouse=True)
+def _cached_verify_password():
+    """Memoize ``verify_password`` behind ``authenticate_user`` for the session.
+
+    Logins repeat the same (password, hash) pairs across the suite. Tests that
+    import ``verify_password`` directly keep the real, uncached function.
+    """
+    from functools import lru_cache
+    import src.core.auth as auth
+
+    mp = pytest.MonkeyPatch()
+    mp.setattr(auth, "verify_password", lru_cache(maxsize=512)(auth.verify_password))
+    yield
+    mp.undo()
+
+@pytest.fixture(scope="session")
+def default_users_snapshot():
+    """Copy of the seeded default ``USERS_DB`` entries, taken once per session."""
+    from src.core.auth import USERS_DB
+    return {username: dict(data) for username, data in USERS_DB.items()}
+
+@pytest.fixture(scope="session")
+def admin_user():
+    """The default admin ``User`` as returned by ``authenticate_user``."""
+    from src.core.auth import authenticate_user
+    return authenticate_user("admin", "admin123")
+
+@pytest.fixture(scope="session")
+def admin_access_token():
+    """Access token for ``{"sub": "admin"}`` minted directly, without a login round-trip."""
+    from src.core.auth import create_access_token
+    return create_access_token({"sub": "admin"})
+
+@pytest.fixture(scope="session")
+def user_access_token():
+    """Access token for ``{"sub": "user"}`` minted directly."""
+    from src.core.auth import create_access_token
+    return create_access_token({"sub": "user"})
+
+@pytest.fixture(scope="session")
+def testuser_access_token():
+    """Access token for ``{"sub": "testuser"}`` minted directly."""
+    from src.core.auth import create_access_token
+    return create_access_token({"sub": "testuser"})
+
+def _hash_once(password):
+    from src.core.auth import get_password_hash
+    return get_password_hash(password)
+
+@pytest.fixture(scope="session")
+def hashed_test123():
+    """bcrypt hash of ``test123``, computed once per session."""
+    return _hash_once("test123")
+
+@pytest.fixture(scope="session")
+def hashed_password123():
+    """bcrypt hash of ``password123``, computed once per session."""
+    return _hash_once("password123")
+
+@pytest.fixture(scope="session")
+def hashed_testpassword123():
+    """bcrypt hash of ``testpassword123``, computed once per session."""
+    return _hash_once("testpassword123")
+
+@pytest.fixture(scope="session")
+def app():
+    """FastAPI application, imported once per worker process.
+
+    The OpenAPI schema is generated here once so the cached
+    ``app.openapi_schema`` is ready before the first test runs. Debug mode
+    is forced off so exceptions propagated by error-path tests never go
+    through Starlette's HTML traceback renderer.
+    """
+    from src.main import app
+    app.debug = False
+    app.openapi()
+    return app
+
+@pytest.fixture(scope="session")
+def client(app):
+    """TestClient shared by the worker, without redirects.
+
+    Entering the client runs the app's startup handlers (service wiring and
+    collection setup) once per worker rather than per test, and one request
+    to ``/api-info`` builds the middleware stack before the first test. Tests
+    that need redirects followed should use ``client_redirects``.
+    """
+    from fastapi.testclient import TestClient
+    with TestClient(app) as test_client:
+        test_client.follow_redirects = False
+        test_client.get("/api-info")
+        yield test_client
+
+@pytest.fixture(autouse=True)
+def _reset_dependency_overrides(request):
+    """Drop any ``app.dependency_overrides`` a test installed on the shared app."""
+    yield
+    if "app" in request.fixturenames:
+        request.getfixturevalue("app").dependency_overrides.clear()
+
+def _login(client, username, password):
+    """Log in through the API and return the token response body."""
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.fixture(scope="session")
+def admin_login(client):
+    """Login response body for the default admin, obtained once per worker."""
+    return _login(client, "admin", "admin123")
+
+@pytest.fixture(scope="session")
+def admin_token(admin_login):
+    """Access token for the default admin, shared across the session."""
+    return admin_login["access_token"]
+
+@pytest.fixture(scope="session")
+def user_token(client):
+    """Access token for the default user, shared across the session."""
+    return _login(client, "user", "user123")["access_token"]
+
+@pytest.fixture(scope="session")
+def admin_headers(admin_token):
+    """Authorization headers for the shared admin token (do not mutate)."""
+    return {"Authorization": f"Bearer {admin_token}"}
+
+@pytest.fixture
+def fresh_admin_token(client):
+    """Admin access token for tests that blacklist it."""
+    return _login(client, "admin", "admin123")["access_token"]
+
+@pytest.fixture
+def fresh_user_token(client):
+    """User access token for tests that blacklist it."""
+    return _login(client, "user", "user123")["access_token"]
+
+@pytest.fixture
+def client_redirects(app):
+    """TestClient that follows redirects."""
+    from fastapi.testclient import TestClient
+    test_client = TestClient(app)
+    yield test_client
+    test_client.close()
 
 @pytest.fixture
 def temp_dir():
@@ -42,17 +269,84 @@ def mock_embedding():
     """Mock embedding vector."""
     return [0.1, 0.2, 0.3, 0.4, 0.5] * 100  # 500-dimensional vector
 
-@pytest.fixture
-def mock_qdrant_client():
-    """Mock Qdrant client."""
+# Shared return values for the Qdrant client mock (only call-tracking is asserted)
+_EMPTY_MOCK = Mock()
+_COLLECTION_MOCK = Mock(points_count=0)
+
+@pytest.fixture(scope="session")
+def _session_qdrant_client():
+    """Qdrant client mock built once per worker."""
     mock_client = Mock()
-    mock_client.get_collections.return_value = Mock()
-    mock_client.get_collection.return_value = Mock(points_count=0)
+    mock_client.get_collections.return_value = _EMPTY_MOCK
+    mock_client.get_collection.return_value = _COLLECTION_MOCK
     mock_client.search.return_value = []
-    mock_client.upsert.return_value = Mock()
-    mock_client.delete_collection.return_value = Mock()
+    mock_client.upsert.return_value = _EMPTY_MOCK
+    mock_client.delete_collection.return_value = _EMPTY_MOCK
     return mock_client
 
+@pytest.fixture
+def mock_qdrant_client(_session_qdrant_client):
+    """Mock Qdrant client with call history reset for each test."""
+    _session_qdrant_client.reset_mock()
+    return _session_qdrant_client
+
+@pytest.fixture
+def mock_rag_core(monkeypatch):
+    """Mock RAG core returned by ``src.main.get_rag_core``."""
+    import src.main
+    rag_core = Mock()
+    monkeypatch.setattr(src.main, "get_rag_core", lambda: rag_core)
+    return rag_core
+
+@pytest.fixture(scope="session")
+def test_user_model():
+    """``User`` model for the ``test_user`` data, validated once per session."""
+    from src.core.models import User
+    return User(**_TEST_USER_DATA)
+
+@pytest.fixture
+def current_user_override(app, test_user_model):
+    """Override ``get_current_active_user`` with ``test_user_model`` for one test."""
+    from src.main import get_current_active_user
+    app.dependency_overrides[get_current_active_user] = lambda: test_user_model
+    yield test_user_model
+    app.dependency_overrides.pop(get_current_active_user, None)
+
+@pytest.fixture
+def fake_rag_core(monkeypatch):
+    """Plain ``MockRagCore`` returned by ``src.main.get_rag_core``."""
+    import src.main
+    from tests.fixtures.mock_objects import MockRagCore
+    rag_core = MockRagCore()
+    monkeypatch.setattr(src.main, "get_rag_core", lambda: rag_core)
+    return rag_core
+
+@pytest.fixture
+def authed_client(client, current_user_override):
+    """Shared client authenticated as ``test_user`` via dependency override."""
+    return client
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the session so async fixtures can be session-scoped."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client(app):
+    """AsyncClient calling the app in-process over ASGITransport (no lifespan)."""
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        await ac.get("/api-info")
+        yield ac
+
+@pytest.fixture
+def authed_async_client(async_client, current_user_override):
+    """Shared AsyncClient authenticated as ``test_user`` via dependency override."""
+    return async_client
+
 @pytest.fixture
 def sample_documents():
     """Sample documents for testing."""
@@ -69,16 +363,18 @@ def sample_documents():
         }
     ]
 
+_TEST_USER_DATA = {
+    "username": "testuser",
+    "email": "test@example.com",
+    "full_name": "Test User",
+    "is_active": True,
+    "role": "user"
+}
+
 @pytest.fixture
 def test_user():
     """Test user data."""
-    return {
-        "username": "testuser",
-        "email": "test@example.com",
-        "full_name": "Test User",
-        "is_active": True,
-        "role": "user"
-    }
+    return dict(_TEST_USER_DATA)
 
 @pytest.fixture
 def test_admin():
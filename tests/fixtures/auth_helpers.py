@@ -5,16 +5,20 @@ This module provides utilities for testing authentication-related functionality.
 """
 
 from unittest.mock import Mock, patch
-from typing import Dict, Any, Optional
-import jwt
-from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import timedelta
 
 
 def create_test_token(username: str = "testuser", 
                      role: str = "user",
                      secret_key: str = "test-secret-key",
-                     expires_delta: Optional[timedelta] = None) -> str:
+                     expires_delta: Optional["timedelta"] = None) -> str:
     """Create a test JWT token."""
+    import jwt
+    from datetime import datetime, timedelta
+    
     if expires_delta is None:
         expires_delta = timedelta(minutes=30)
     
@@ -34,6 +38,9 @@ def create_expired_token(username: str = "testuser",
                         role: str = "user", 
                         secret_key: str = "test-secret-key") -> str:
     """Create an expired JWT token."""
+    import jwt
+    from datetime import datetime, timedelta
+    
     expire = datetime.utcnow() - timedelta(minutes=30)  # Expired 30 minutes ago
     
     to_encode = {
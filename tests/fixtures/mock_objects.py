@@ -5,12 +5,14 @@ This module provides mock objects and factory functions for creating test data.
 """
 
 from unittest.mock import Mock, MagicMock
-import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
 import tempfile
 import os
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class MockOllamaResponse:
     """Mock Ollama API response."""
@@ -98,6 +100,32 @@ class MockQdrantClient:
         return mock_response
 
 
+class MockRagCore:
+    """Plain RAG core stand-in for the legacy /ask and /upsert endpoints.
+    
+    Set ``ask_result`` / ``index_result`` to the value to return, or to an
+    exception instance to raise it.
+    """
+    
+    def __init__(self):
+        self.ask_result: Any = {"answer": "Test answer", "sources": []}
+        self.index_result: Any = {"indexed": 0, "message": "No indexable docs"}
+    
+    @staticmethod
+    def _resolve(result: Any) -> Any:
+        if isinstance(result, BaseException):
+            raise result
+        return result
+    
+    def ask_question(self, query: str, top_k: int = None) -> Dict[str, Any]:
+        """Mock ask question."""
+        return self._resolve(self.ask_result)
+    
+    def index_documents(self, datapath: str = None, clear: bool = False) -> Dict[str, Any]:
+        """Mock index documents."""
+        return self._resolve(self.index_result)
+
+
 class MockDatabaseManager:
     """Mock database manager for testing."""
     
@@ -130,8 +158,10 @@ class MockDatabaseManager:
         return False
 
 
-def create_mock_embedding(dimensions: int = 300) -> np.ndarray:
+def create_mock_embedding(dimensions: int = 300) -> "np.ndarray":
     """Create a mock embedding vector."""
+    import numpy as np
+    
     return np.random.rand(dimensions).astype(np.float32)
 
 
@@ -4,24 +4,11 @@ Tests login, logout, and token validation endpoints.
 """
 import pytest
 import json
-from fastapi.testclient import TestClient
-from src.main import app
 
 
 class TestAuthAPI:
     """Test authentication API endpoints."""
     
-    def setup_method(self):
-        """Setup test data before each test."""
-        # Clear any existing blacklist for each test
-        from src.core.auth import BLACKLISTED_TOKENS
-        BLACKLISTED_TOKENS.clear()
-    
-    @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
-    
     def test_login_success_admin(self, client):
         """Test successful login for admin user."""
         response = client.post(
@@ -119,21 +106,11 @@ class TestAuthAPI:
         
         assert response.status_code == 422
     
-    def test_get_current_user_success(self, client):
+    def test_get_current_user_success(self, client, admin_headers):
         """Test getting current user with valid token."""
-        # First login to get token
-        login_response = client.post(
-            "/auth/login",
-            json={"username": "admin", "password": "admin123"}
-        )
-        
-        assert login_response.status_code == 200
-        token = login_response.json()["access_token"]
-        
-        # Use token to get current user
         response = client.get(
             "/auth/me",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=admin_headers
         )
         
         assert response.status_code == 200
@@ -176,21 +153,11 @@ class TestAuthAPI:
         data = response.json()
         assert "detail" in data
     
-    def test_logout_success(self, client):
+    def test_logout_success(self, client, fresh_admin_token):
         """Test successful logout."""
-        # First login to get token
-        login_response = client.post(
-            "/auth/login",
-            json={"username": "admin", "password": "admin123"}
-        )
-        
-        assert login_response.status_code == 200
-        token = login_response.json()["access_token"]
-        
-        # Logout
         response = client.post(
             "/auth/logout",
-            headers={"Authorization": f"Bearer {token}"}
+            headers={"Authorization": f"Bearer {fresh_admin_token}"}
         )
         
         assert response.status_code == 200
@@ -221,45 +188,23 @@ class TestAuthAPI:
         assert "message" in data
         assert "Logged out successfully" in data["message"]
     
-    def test_token_expiration_handling(self, client):
+    def test_token_expiration_handling(self, admin_login):
         """Test that expired tokens are properly handled."""
         # This test would require mocking time or using a very short expiration
         # For now, we'll test that the endpoint exists and returns proper format
-        login_response = client.post(
-            "/auth/login",
-            json={"username": "admin", "password": "admin123"}
-        )
-        
-        assert login_response.status_code == 200
-        token_data = login_response.json()
+        token_data = admin_login
         assert "expires_in" in token_data
         assert token_data["expires_in"] == 1800  # 30 minutes
     
-    def test_multiple_user_sessions(self, client):
+    def test_multiple_user_sessions(self, client, admin_token, admin_headers, user_token):
         """Test that multiple users can login simultaneously."""
-        # Login as admin
-        admin_response = client.post(
-            "/auth/login",
-            json={"username": "admin", "password": "admin123"}
-        )
-        assert admin_response.status_code == 200
-        admin_token = admin_response.json()["access_token"]
-        
-        # Login as user
-        user_response = client.post(
-            "/auth/login",
-            json={"username": "user", "password": "user123"}
-        )
-        assert user_response.status_code == 200
-        user_token = user_response.json()["access_token"]
-        
         # Verify both tokens are different
         assert admin_token != user_token
         
         # Verify both users can access their own data
         admin_me = client.get(
             "/auth/me",
-            headers={"Authorization": f"Bearer {admin_token}"}
+            headers=admin_headers
         )
         assert admin_me.status_code == 200
         assert admin_me.json()["username"] == "admin"
@@ -10,401 +10,202 @@ This module tests the streaming functionality including:
 - Regression tests for fixed issues
 """
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
-from fastapi.testclient import TestClient
-from fastapi import status
-import json
 import numpy as np
-from io import BytesIO
 
-# Import the app
-from src.main import app
+import src.main
+
+# Embedding returned by the mocked embed_ollama (shape matches the real function).
+# Read-only because every test shares the same array.
+_SHARED_EMBEDDING = np.tile(np.array([0.1, 0.2, 0.3], dtype=np.float32), 100)
+_SHARED_EMBEDDING.setflags(write=False)
+
+# Marks a chunk field that must be absent
+_MISSING = object()
+
+
+@pytest.fixture
+def mock_pipeline(monkeypatch):
+    """Mock the Qdrant client, query embedding and LLM stream behind /ask/stream.
+    
+    Defaults: 5 indexed points, no search hits, a fixed embedding and a
+    single-chunk answer. Tests override ``qclient``/``embed``/``stream`` as needed.
+    """
+    qclient = Mock()
+    qclient.get_collection.return_value = SimpleNamespace(points_count=5)
+    qclient.search.return_value = []
+    embed = Mock(return_value=_SHARED_EMBEDDING)
+    stream = Mock(return_value=[b"Test response"])
+    monkeypatch.setattr(src.main, "get_qdrant_client", lambda: qclient)
+    monkeypatch.setattr(src.main, "embed_ollama", embed)
+    monkeypatch.setattr(src.main, "stream_answer", stream)
+    return SimpleNamespace(qclient=qclient, embed=embed, stream=stream)
+
+
+# mock_pipeline configurators for the fallback-message tests
+def _cfg_no_docs(pipeline):
+    pipeline.qclient.get_collection.return_value = SimpleNamespace(points_count=0)
+
+
+def _cfg_db_err(pipeline):
+    pipeline.qclient.get_collection.side_effect = Exception("Database connection failed")
+
+
+def _cfg_embed_err(pipeline):
+    pipeline.embed.side_effect = Exception("Embedding service unavailable")
+
+
+def _cfg_search_err(pipeline):
+    pipeline.qclient.search.side_effect = Exception("Search service unavailable")
+
+
+def _cfg_no_results(pipeline):
+    pipeline.qclient.search.return_value = []  # No results
 
 
 class TestStreamingEndpoints:
     """Test streaming endpoint functionality."""
     
-    def setup_method(self):
-        """Clear blacklisted tokens before each test."""
-        from src.core.auth import BLACKLISTED_TOKENS, BLACKLISTED_REFRESH_TOKENS
-        BLACKLISTED_TOKENS.clear()
-        BLACKLISTED_REFRESH_TOKENS.clear()
+    pytestmark = pytest.mark.asyncio
     
-    def get_auth_token(self, client):
-        """Helper method to get authentication token."""
-        response = client.post("/auth/login", json={
-            "username": "admin",
-            "password": "admin123"
-        })
-        return response.json()["access_token"]
-    
-    def test_ask_stream_endpoint_success(self):
+    async def test_ask_stream_endpoint_success(self, async_client, admin_headers, mock_pipeline):
         """Test successful streaming ask endpoint with authentication."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+        mock_pipeline.qclient.search.return_value = [
+            SimpleNamespace(payload={"text": "AI is artificial intelligence", "doc_path": "doc1.txt", "chunk_index": 0})
+        ]
+        mock_pipeline.stream.return_value = [b"This is a ", b"streaming ", b"response."]
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            # Mock Qdrant client and responses
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={"text": "AI is artificial intelligence", "doc_path": "doc1.txt", "chunk_index": 0})
-            ]
-            
-            # Mock embedding - return numpy array like the real function
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            
-            # Mock streaming response
-            mock_stream.return_value = [b"This is a ", b"streaming ", b"response."]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            # Note: TestClient may not always include transfer-encoding header
-            # The important thing is that the response is successful and has the right content type
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "What is AI?"}
+        )
+        
+        assert response.status_code == 200
+        assert "text/plain" in response.headers["content-type"]
+        # Note: the test client may not always include transfer-encoding header
+        # The important thing is that the response is successful and has the right content type
     
-    def test_ask_stream_endpoint_unauthorized(self):
+    async def test_ask_stream_endpoint_unauthorized(self, async_client):
         """Test streaming ask endpoint without authentication."""
-        client = TestClient(app)
-        
-        response = client.post("/ask/stream", json={"query": "What is AI?"})
+        response = await async_client.post("/ask/stream", json={"query": "What is AI?"})
         
         assert response.status_code == 401
         assert "unauthorized" in response.json()["detail"].lower()
     
-    def test_ask_stream_endpoint_no_documents(self):
-        """Test streaming ask endpoint when no documents are indexed."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+    @pytest.mark.parametrize("configure,expected", [
+        (_cfg_no_docs, b"No documents indexed"),
+        (_cfg_db_err, b"Database error"),
+        (_cfg_embed_err, b"Embedding failed"),
+        (_cfg_search_err, b"Search failed"),
+        (_cfg_no_results, b"No relevant information found"),
+    ], ids=["no-documents", "database-error", "embedding-failure", "search-failure", "no-relevant-results"])
+    async def test_ask_stream_endpoint_fallback_messages(self, async_client, admin_headers, mock_pipeline, configure, expected):
+        """Test streaming ask endpoint streams a plain-text message when a pipeline step has nothing to return."""
+        configure(mock_pipeline)
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant:
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=0)
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            # Should return a message about no documents indexed
-            content = response.text
-            assert "No documents indexed" in content
-    
-    def test_ask_stream_endpoint_database_error(self):
-        """Test streaming ask endpoint when database error occurs."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "What is AI?"}
+        )
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant:
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.side_effect = Exception("Database connection failed")
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            content = response.text
-            assert "Database error" in content
-    
-    def test_ask_stream_endpoint_embedding_failure(self):
-        """Test streaming ask endpoint when embedding fails."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
-        
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_embed.side_effect = Exception("Embedding service unavailable")
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            content = response.text
-            assert "Embedding failed" in content
-    
-    def test_ask_stream_endpoint_search_failure(self):
-        """Test streaming ask endpoint when search fails."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
-        
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_qclient.search.side_effect = Exception("Search service unavailable")
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            content = response.text
-            assert "Search failed" in content
-    
-    def test_ask_stream_endpoint_no_relevant_results(self):
-        """Test streaming ask endpoint when no relevant results found."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
-        
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_qclient.search.return_value = []  # No results
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            content = response.text
-            assert "No relevant information found" in content
+        assert response.status_code == 200
+        assert "text/plain" in response.headers["content-type"]
+        assert expected in response.content
 
 
 class TestPayloadStructureHandling:
     """Test payload structure handling for different document formats."""
     
-    def get_auth_token(self, client):
-        """Helper method to get authentication token."""
-        response = client.post("/auth/login", json={
-            "username": "admin",
-            "password": "admin123"
-        })
-        return response.json()["access_token"]
+    pytestmark = pytest.mark.asyncio
     
-    def test_payload_with_chunk_index(self):
-        """Test payload structure with chunk_index field (original format)."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+    @pytest.mark.parametrize("payload,expected_text,expected_doc_path,expected_chunk_index", [
+        # Original format with chunk_index
+        ({"text": "AI is artificial intelligence", "doc_path": "doc1.txt", "chunk_index": 0},
+         "AI is artificial intelligence", "doc1.txt", 0),
+        # No chunk_index field (regression test) - should not be present
+        ({"text": "AI is artificial intelligence", "doc_path": "doc1.txt"},
+         "AI is artificial intelligence", "doc1.txt", _MISSING),
+        # Missing doc_path - should default to "unknown"
+        ({"text": "AI is artificial intelligence"},
+         "AI is artificial intelligence", "unknown", _MISSING),
+        # Empty text - should preserve empty string
+        ({"text": "", "doc_path": "doc1.txt"},
+         "", "doc1.txt", _MISSING),
+    ], ids=["with-chunk-index", "without-chunk-index", "missing-doc-path", "empty-text"])
+    async def test_payload_structure(self, async_client, admin_headers, mock_pipeline,
+                               payload, expected_text, expected_doc_path, expected_chunk_index):
+        """Test search payloads are mapped to the chunks passed to stream_answer."""
+        mock_pipeline.qclient.search.return_value = [SimpleNamespace(payload=payload)]
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={
-                    "text": "AI is artificial intelligence", 
-                    "doc_path": "doc1.txt", 
-                    "chunk_index": 0
-                })
-            ]
-            
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            # Verify stream_answer was called with correct chunk structure
-            mock_stream.assert_called_once()
-            call_args = mock_stream.call_args[0]
-            query, chunks = call_args
-            assert query == "What is AI?"
-            assert len(chunks) == 1
-            assert chunks[0]["text"] == "AI is artificial intelligence"
-            assert chunks[0]["doc_path"] == "doc1.txt"
-            assert chunks[0]["chunk_index"] == 0
-    
-    def test_payload_without_chunk_index(self):
-        """Test payload structure without chunk_index field (regression test)."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
-        
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={
-                    "text": "AI is artificial intelligence", 
-                    "doc_path": "doc1.txt"
-                    # No chunk_index field
-                })
-            ]
-            
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            # Verify stream_answer was called with correct chunk structure
-            mock_stream.assert_called_once()
-            call_args = mock_stream.call_args[0]
-            query, chunks = call_args
-            assert query == "What is AI?"
-            assert len(chunks) == 1
-            assert chunks[0]["text"] == "AI is artificial intelligence"
-            assert chunks[0]["doc_path"] == "doc1.txt"
-            assert "chunk_index" not in chunks[0]  # Should not be present
-    
-    def test_payload_with_missing_fields(self):
-        """Test payload structure with missing text or doc_path fields."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
-        
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={
-                    "text": "AI is artificial intelligence"
-                    # Missing doc_path
-                })
-            ]
-            
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            # Verify stream_answer was called with correct chunk structure
-            mock_stream.assert_called_once()
-            call_args = mock_stream.call_args[0]
-            query, chunks = call_args
-            assert query == "What is AI?"
-            assert len(chunks) == 1
-            assert chunks[0]["text"] == "AI is artificial intelligence"
-            assert chunks[0]["doc_path"] == "unknown"  # Should default to "unknown"
-    
-    def test_payload_with_empty_text(self):
-        """Test payload structure with empty text field."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "What is AI?"}
+        )
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={
-                    "text": "",  # Empty text
-                    "doc_path": "doc1.txt"
-                })
-            ]
-            
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            # Verify stream_answer was called with correct chunk structure
-            mock_stream.assert_called_once()
-            call_args = mock_stream.call_args[0]
-            query, chunks = call_args
-            assert query == "What is AI?"
-            assert len(chunks) == 1
-            assert chunks[0]["text"] == ""  # Should preserve empty string
-            assert chunks[0]["doc_path"] == "doc1.txt"
+        assert response.status_code == 200
+        # Verify stream_answer was called with correct chunk structure
+        mock_pipeline.stream.assert_called_once()
+        query, chunks = mock_pipeline.stream.call_args[0]
+        assert query == "What is AI?"
+        assert len(chunks) == 1
+        assert chunks[0]["text"] == expected_text
+        assert chunks[0]["doc_path"] == expected_doc_path
+        assert chunks[0].get("chunk_index", _MISSING) == expected_chunk_index
+
+
+# Ollama stream lines as yielded by iter_lines(decode_unicode=True) in stream_answer
+_LINES_HELLO_WORLD = (
+    '{"response": "Hello", "done": false}',
+    '{"response": " world", "done": false}',
+    '{"response": "!", "done": true}',
+)
+_LINES_WITH_INVALID_JSON = (
+    '{"response": "Valid JSON", "done": false}',
+    'Invalid JSON line',
+    '{"response": "Another valid", "done": true}',
+)
+_LINES_WITH_EMPTY_RESPONSE = (
+    '{"response": "", "done": false}',  # Empty response
+    '{"response": "Valid response", "done": false}',
+    '{"done": true}',  # No response field
+)
+_LINES_SINGLE = ('{"response": "Response", "done": true}',)
+
+
+def _mock_post_yielding(lines):
+    """Context-manager mock for ``requests.post`` whose response yields ``lines``."""
+    resp = MagicMock(status_code=200)
+    resp.raise_for_status.return_value = None
+    resp.iter_lines.return_value = lines
+    cm = MagicMock()
+    cm.__enter__.return_value = resp
+    return cm
 
 
 class TestStreamAnswerFunction:
     """Test the stream_answer helper function directly."""
     
-    def test_stream_answer_basic_functionality(self):
-        """Test basic stream_answer function functionality."""
-        from src.main import stream_answer
+    @pytest.mark.parametrize("lines,expected", [
+        (_LINES_HELLO_WORLD, [b"Hello", b" world", b"!"]),
+        # Should skip invalid JSON and return valid responses
+        (_LINES_WITH_INVALID_JSON, [b"Valid JSON", b"Another valid"]),
+        # Should only return non-empty responses
+        (_LINES_WITH_EMPTY_RESPONSE, [b"Valid response"]),
+    ], ids=["basic", "json-decode-error", "empty-response"])
+    def test_stream_answer_yields_response_chunks(self, lines, expected):
+        """Test stream_answer yields the non-empty response of each valid JSON line."""
+        ctx_blocks = [{"text": "Test context", "doc_path": "test.txt"}]
         
-        # Mock the requests.post call
-        with patch('src.main.requests.post') as mock_post:
-            # Mock the streaming response
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.raise_for_status.return_value = None
-            mock_response.iter_lines.return_value = [
-                '{"response": "Hello", "done": false}',
-                '{"response": " world", "done": false}',
-                '{"response": "!", "done": true}'
-            ]
-            mock_post.return_value.__enter__.return_value = mock_response
-            
-            # Test data
-            query = "Test question"
-            ctx_blocks = [
-                {"text": "Test context", "doc_path": "test.txt"}
-            ]
-            
-            # Call the function
-            result = list(stream_answer(query, ctx_blocks))
-            
-            # Verify results
-            assert len(result) == 3
-            assert result[0] == b"Hello"
-            assert result[1] == b" world"
-            assert result[2] == b"!"
+        with patch.object(src.main.ollama_session, 'post', return_value=_mock_post_yielding(lines)):
+            result = list(src.main.stream_answer("Test question", ctx_blocks))
+        
+        assert result == expected
     
     def test_stream_answer_with_multiple_context_blocks(self):
         """Test stream_answer with multiple context blocks."""
-        from src.main import stream_answer
-        
-        with patch('src.main.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.raise_for_status.return_value = None
-            mock_response.iter_lines.return_value = [
-                '{"response": "Response", "done": true}'
-            ]
-            mock_post.return_value.__enter__.return_value = mock_response
-            
+        mock_cm = _mock_post_yielding(_LINES_SINGLE)
+        with patch.object(src.main.ollama_session, 'post', return_value=mock_cm) as mock_post:
             query = "Test question"
             ctx_blocks = [
                 {"text": "Context 1", "doc_path": "doc1.txt"},
@@ -412,7 +213,7 @@ class TestStreamAnswerFunction:
                 {"text": "Context 3", "doc_path": "doc3.txt", "chunk_index": 0}
             ]
             
-            result = list(stream_answer(query, ctx_blocks))
+            result = list(src.main.stream_answer(query, ctx_blocks))
             
             # Verify the request was made with proper context formatting
             mock_post.assert_called_once()
@@ -428,175 +229,79 @@ class TestStreamAnswerFunction:
             assert "From doc2.txt: Context 2" in json_payload["prompt"]
             assert "From doc3.txt: Context 3" in json_payload["prompt"]
             assert "Test question" in json_payload["prompt"]
-    
-    def test_stream_answer_handles_json_decode_error(self):
-        """Test stream_answer handles JSON decode errors gracefully."""
-        from src.main import stream_answer
-        
-        with patch('src.main.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.raise_for_status.return_value = None
-            mock_response.iter_lines.return_value = [
-                '{"response": "Valid JSON", "done": false}',
-                'Invalid JSON line',
-                '{"response": "Another valid", "done": true}'
-            ]
-            mock_post.return_value.__enter__.return_value = mock_response
-            
-            query = "Test question"
-            ctx_blocks = [{"text": "Test context", "doc_path": "test.txt"}]
-            
-            result = list(stream_answer(query, ctx_blocks))
-            
-            # Should skip invalid JSON and return valid responses
-            assert len(result) == 2
-            assert result[0] == b"Valid JSON"
-            assert result[1] == b"Another valid"
-    
-    def test_stream_answer_handles_empty_response(self):
-        """Test stream_answer handles empty response fields."""
-        from src.main import stream_answer
-        
-        with patch('src.main.requests.post') as mock_post:
-            mock_response = Mock()
-            mock_response.status_code = 200
-            mock_response.raise_for_status.return_value = None
-            mock_response.iter_lines.return_value = [
-                '{"response": "", "done": false}',  # Empty response
-                '{"response": "Valid response", "done": false}',
-                '{"done": true}'  # No response field
-            ]
-            mock_post.return_value.__enter__.return_value = mock_response
-            
-            query = "Test question"
-            ctx_blocks = [{"text": "Test context", "doc_path": "test.txt"}]
-            
-            result = list(stream_answer(query, ctx_blocks))
-            
-            # Should only return non-empty responses
-            assert len(result) == 1
-            assert result[0] == b"Valid response"
 
 
 class TestStreamingRegressionTests:
     """Regression tests for issues that were fixed."""
     
-    def get_auth_token(self, client):
-        """Helper method to get authentication token."""
-        response = client.post("/auth/login", json={
-            "username": "admin",
-            "password": "admin123"
-        })
-        return response.json()["access_token"]
-    
-    def test_regression_keyerror_chunk_index(self):
+    @pytest.mark.asyncio
+    async def test_regression_keyerror_chunk_index(self, async_client, admin_headers, mock_pipeline):
         """Regression test for KeyError: 'chunk_index' issue."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+        # This payload structure was causing the KeyError
+        mock_pipeline.qclient.search.return_value = [
+            SimpleNamespace(payload={
+                "text": "AI is artificial intelligence", 
+                "doc_path": "doc1.txt"
+                # Missing chunk_index - this was causing the error
+            })
+        ]
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            # This payload structure was causing the KeyError
-            mock_qclient.search.return_value = [
-                Mock(payload={
-                    "text": "AI is artificial intelligence", 
-                    "doc_path": "doc1.txt"
-                    # Missing chunk_index - this was causing the error
-                })
-            ]
-            
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            # This should not raise a KeyError anymore
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "What is AI?"}
-            )
-            
-            assert response.status_code == 200
-            # Verify the function completed successfully without KeyError
+        # This should not raise a KeyError anymore
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "What is AI?"}
+        )
+        
+        assert response.status_code == 200
+        # Verify the function completed successfully without KeyError
     
     def test_regression_syntax_errors(self):
         """Regression test to ensure syntax errors are fixed."""
-        # This test ensures the module can be imported without syntax errors
-        from src.main import app, stream_answer, embed_ollama, sha1_u64
-        
-        # Basic functionality tests
-        assert app is not None
-        assert callable(stream_answer)
-        assert callable(embed_ollama)
-        assert callable(sha1_u64)
+        # The module-level import already proves src.main loads without syntax errors
+        assert src.main.app is not None
+        assert callable(src.main.stream_answer)
+        assert callable(src.main.embed_ollama)
+        assert callable(src.main.sha1_u64)
         
         # Test sha1_u64 function
-        result = sha1_u64("test")
+        result = src.main.sha1_u64("test")
         assert isinstance(result, int)
         assert result > 0
     
-    def test_regression_authentication_flow(self):
+    @pytest.mark.asyncio
+    async def test_regression_authentication_flow(self, async_client, admin_headers, mock_pipeline):
         """Regression test for authentication flow with streaming."""
-        client = TestClient(app)
-        
         # Test that authentication is required
-        response = client.post("/ask/stream", json={"query": "test"})
+        response = await async_client.post("/ask/stream", json={"query": "test"})
         assert response.status_code == 401
         
         # Test that valid authentication works
-        token = self.get_auth_token(client)
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = []
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Test response"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "test"}
-            )
-            
-            assert response.status_code == 200
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "test"}
+        )
+        
+        assert response.status_code == 200
     
-    def test_regression_streaming_response_format(self):
+    @pytest.mark.asyncio
+    async def test_regression_streaming_response_format(self, async_client, admin_headers, mock_pipeline):
         """Regression test for proper streaming response format."""
-        client = TestClient(app)
-        token = self.get_auth_token(client)
+        mock_pipeline.qclient.search.return_value = [
+            SimpleNamespace(payload={"text": "test", "doc_path": "test.txt"})
+        ]
+        mock_pipeline.stream.return_value = [b"Chunk1", b"Chunk2", b"Chunk3"]
         
-        with patch('src.main.get_qdrant_client') as mock_get_qdrant, \
-             patch('src.main.embed_ollama') as mock_embed, \
-             patch('src.main.stream_answer') as mock_stream:
-            
-            mock_qclient = Mock()
-            mock_get_qdrant.return_value = mock_qclient
-            mock_qclient.get_collection.return_value = Mock(points_count=5)
-            mock_qclient.search.return_value = [
-                Mock(payload={"text": "test", "doc_path": "test.txt"})
-            ]
-            mock_embed.return_value = np.array([0.1, 0.2, 0.3] * 100, dtype=np.float32)
-            mock_stream.return_value = [b"Chunk1", b"Chunk2", b"Chunk3"]
-            
-            response = client.post("/ask/stream",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"query": "test"}
-            )
-            
-            assert response.status_code == 200
-            assert "text/plain" in response.headers["content-type"]
-            # Note: TestClient may not always include transfer-encoding header
-            # The important thing is that the response is successful and has the right content type
-            
-            # Verify the response content
-            content = response.text
-            assert "Chunk1" in content
-            assert "Chunk2" in content
-            assert "Chunk3" in content
+        response = await async_client.post("/ask/stream",
+            headers=admin_headers,
+            json={"query": "test"}
+        )
+        
+        assert response.status_code == 200
+        assert "text/plain" in response.headers["content-type"]
+        # Note: the test client may not always include transfer-encoding header
+        # The important thing is that the response is successful and has the right content type
+        
+        # Verify the response content
+        assert b"Chunk1" in response.content
+        assert b"Chunk2" in response.content
+        assert b"Chunk3" in response.content
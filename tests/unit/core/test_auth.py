@@ -12,7 +12,7 @@ import asyncio
 from unittest.mock import patch, Mock
 from fastapi import HTTPException, status
 from src.core.auth import (
-    get_password_hash, verify_password,
+    verify_password,
     authenticate_user, create_access_token, get_current_user,
     get_current_active_user, get_current_admin_user,
     get_current_user_from_token, 
@@ -28,19 +28,19 @@ from datetime import timedelta
 class TestPasswordHashing:
     """Test password hashing functions."""
     
-    def test_get_password_hash(self):
+    def test_get_password_hash(self, hashed_testpassword123):
         """Test password hashing."""
         password = "testpassword123"
-        hashed = get_password_hash(password)
+        hashed = hashed_testpassword123
         
         assert hashed != password
         assert len(hashed) > 0
         assert hashed.startswith("$2b$")
     
-    def test_verify_password(self):
+    def test_verify_password(self, hashed_testpassword123):
         """Test password verification."""
         password = "testpassword123"
-        hashed = get_password_hash(password)
+        hashed = hashed_testpassword123
         
         assert verify_password(password, hashed) is True
         assert verify_password("wrongpassword", hashed) is False
@@ -61,30 +61,22 @@ class TestUserAuthentication:
         assert user.role == "admin"
         assert user.is_active is True
     
-    def test_authenticate_user_invalid_username(self):
-        """Test authentication with invalid username."""
-        username = "nonexistent"
-        password = "admin123"
-        
+    @pytest.mark.parametrize("username,password", [
+        ("nonexistent", "admin123"),
+        ("admin", "wrongpassword"),
+    ], ids=["invalid-username", "invalid-password"])
+    def test_authenticate_user_invalid_credentials(self, username, password):
+        """Test authentication with an unknown username or a wrong password."""
         user = authenticate_user(username, password)
         
         assert user is None
     
-    def test_authenticate_user_invalid_password(self):
-        """Test authentication with invalid password."""
-        username = "admin"
-        password = "wrongpassword"
-        
-        user = authenticate_user(username, password)
-        
-        assert user is None
-    
-    def test_authenticate_user_inactive(self):
+    def test_authenticate_user_inactive(self, hashed_password123):
         """Test authentication with inactive user."""
         # Create inactive user
         test_user = {
             "username": "inactive_user",
-            "hashed_password": get_password_hash("password123"),
+            "hashed_password": hashed_password123,
             "email": "inactive@example.com",
             "full_name": "Inactive User",
             "is_active": False,
@@ -114,13 +106,12 @@ class TestTokenManagement:
         assert isinstance(token, str)
         assert len(token) > 0
     
-    def test_token_blacklisting(self):
+    def test_token_blacklisting(self, monkeypatch):
         """Test token blacklisting functionality."""
         token = "test_token_123"
         
-        # Clear any existing blacklist for this test
-        from src.core.auth import BLACKLISTED_TOKENS
-        BLACKLISTED_TOKENS.discard(token)
+        # Blacklist into a fresh set private to this test
+        monkeypatch.setattr(auth_module, "BLACKLISTED_TOKENS", set())
         
         # Initially not blacklisted
         assert is_token_blacklisted(token) is False
@@ -131,12 +122,9 @@ class TestTokenManagement:
         # Now should be blacklisted
         assert is_token_blacklisted(token) is True
     
-    def test_token_decode_valid(self):
+    def test_token_decode_valid(self, testuser_access_token):
         """Test decoding valid token."""
-        data = {"sub": "testuser"}
-        token = create_access_token(data)
-        
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(testuser_access_token, SECRET_KEY, algorithms=[ALGORITHM])
         
         assert payload["sub"] == "testuser"
         assert "exp" in payload
@@ -199,10 +187,16 @@ class TestUserModels:
         assert user_login.username == "testuser"
         assert user_login.password == "password123"
 
+@pytest.fixture
+def mock_get_current_user(monkeypatch):
+    """Replace src.core.auth.get_current_user with a Mock for the dependency tests."""
+    mock = Mock()
+    monkeypatch.setattr(auth_module, "get_current_user", mock)
+    return mock
+
 class TestAuthenticationDependencies:
     """Test FastAPI authentication dependencies."""
     
-    @patch('src.core.auth.get_current_user')
     def test_get_current_active_user(self, mock_get_current_user):
         """Test get_current_active_user dependency."""
         # Mock active user
@@ -220,7 +214,6 @@ class TestAuthenticationDependencies:
         assert result == active_user
         assert result.is_active is True
     
-    @patch('src.core.auth.get_current_user')
     @pytest.mark.asyncio
     async def test_get_current_active_user_inactive(self, mock_get_current_user):
         """Test get_current_active_user with inactive user."""
@@ -240,7 +233,6 @@ class TestAuthenticationDependencies:
         assert exc_info.value.status_code == 400
         assert "Inactive user" in str(exc_info.value.detail)
     
-    @patch('src.core.auth.get_current_user')
     def test_get_current_admin_user(self, mock_get_current_user):
         """Test get_current_admin_user dependency."""
         # Mock admin user
@@ -258,7 +250,6 @@ class TestAuthenticationDependencies:
         assert result == admin_user
         assert result.role == "admin"
     
-    @patch('src.core.auth.get_current_user')
     @pytest.mark.asyncio
     async def test_get_current_admin_user_non_admin(self, mock_get_current_user):
         """Test get_current_admin_user with non-admin user."""
@@ -281,12 +272,8 @@ class TestAuthenticationDependencies:
 class TestTokenBasedAuthentication:
     """Test token-based authentication functions."""
     
-    def test_get_current_user_from_token_valid(self):
+    def test_get_current_user_from_token_valid(self, admin_access_token):
         """Test get_current_user_from_token with valid token."""
-        # Create a valid token
-        data = {"sub": "admin"}
-        token = create_access_token(data)
-        
         # Mock the get_user function
         with patch('src.core.auth.USERS_DB') as mock_users_db:
             mock_user_data = {
@@ -299,12 +286,53 @@ class TestTokenBasedAuthentication:
             }
             mock_users_db.get.return_value = mock_user_data
             
-            result = get_current_user_from_token(token)
+            result = get_current_user_from_token(admin_access_token)
             
             assert result is not None
             assert result.username == "admin"
             mock_users_db.get.assert_called_once_with("admin")
     
+    def test_get_current_user_from_token_decodes_once(self, admin_access_token, monkeypatch):
+        """Test that a repeated token is served from the decoded-token cache."""
+        decode = Mock(wraps=auth_module.jwt.decode)
+        monkeypatch.setattr(auth_module.jwt, "decode", decode)
+        
+        first = get_current_user_from_token(admin_access_token)
+        second = get_current_user_from_token(admin_access_token)
+        
+        assert first.username == second.username == "admin"
+        assert decode.call_count == 1
+    
+    def test_get_current_user_from_token_expired_cache_entry(self, admin_access_token):
+        """Test that an expired cache entry is dropped and the token decoded again."""
+        key = (auth_module.settings.secret_key, admin_access_token)
+        auth_module.TOKEN_CACHE[key] = (0.0, "someone_else")
+        
+        result = get_current_user_from_token(admin_access_token)
+        
+        assert result.username == "admin"
+        assert auth_module.TOKEN_CACHE[key][1] == "admin"
+    
+    def test_get_current_user_from_token_secret_rotation(self, admin_access_token, monkeypatch):
+        """Test that a cached decode is not reused once SECRET_KEY changes."""
+        assert get_current_user_from_token(admin_access_token).username == "admin"
+        
+        monkeypatch.setattr(auth_module.settings, "secret_key", "rotated-secret-key")
+        
+        assert get_current_user_from_token(admin_access_token) is None
+    
+    def test_token_cache_evicts_oldest_entry(self, admin_access_token, monkeypatch):
+        """Test that a full token cache drops only its oldest entry."""
+        monkeypatch.setattr(auth_module, "TOKEN_CACHE_MAXSIZE", 2)
+        auth_module.TOKEN_CACHE[("old-secret", "stale-token")] = (float("inf"), "stale")
+        auth_module.TOKEN_CACHE[("old-secret", "other-token")] = (float("inf"), "other")
+        
+        auth_module.verify_token(admin_access_token)
+        
+        assert ("old-secret", "stale-token") not in auth_module.TOKEN_CACHE
+        assert ("old-secret", "other-token") in auth_module.TOKEN_CACHE
+        assert len(auth_module.TOKEN_CACHE) == 2
+    
     def test_get_current_user_from_token_invalid(self):
         """Test get_current_user_from_token with invalid token."""
         invalid_token = "invalid.token.here"
@@ -312,14 +340,11 @@ class TestTokenBasedAuthentication:
         result = get_current_user_from_token(invalid_token)
         assert result is None
     
-    def test_get_current_user_from_token_blacklisted(self):
+    def test_get_current_user_from_token_blacklisted(self, admin_access_token):
         """Test get_current_user_from_token with blacklisted token."""
-        # Create and blacklist a token
-        data = {"sub": "admin"}
-        token = create_access_token(data)
-        blacklist_token(token)
+        blacklist_token(admin_access_token)
         
-        result = get_current_user_from_token(token)
+        result = get_current_user_from_token(admin_access_token)
         assert result is None
     
     def test_get_current_active_user_from_token(self):
@@ -5,7 +5,6 @@ Tests user creation, password hashing, and authentication logic.
 import pytest
 from unittest.mock import patch, MagicMock
 from src.core.auth import (
-    get_password_hash,
     verify_password,
     authenticate_user,
     create_access_token,
@@ -17,27 +16,27 @@ from src.core.auth import (
 class TestPasswordHashing:
     """Test password hashing and verification."""
     
-    def test_password_hashing(self):
+    def test_password_hashing(self, hashed_test123):
         """Test that passwords are properly hashed."""
         password = "test123"
-        hashed = get_password_hash(password)
+        hashed = hashed_test123
         
         assert hashed != password
         assert len(hashed) > 0
         assert hashed.startswith("$2b$")
     
-    def test_password_verification_success(self):
+    def test_password_verification_success(self, hashed_test123):
         """Test successful password verification."""
         password = "test123"
-        hashed = get_password_hash(password)
+        hashed = hashed_test123
         
         assert verify_password(password, hashed) is True
     
-    def test_password_verification_failure(self):
+    def test_password_verification_failure(self, hashed_test123):
         """Test failed password verification."""
         password = "test123"
         wrong_password = "wrong123"
-        hashed = get_password_hash(password)
+        hashed = hashed_test123
         
         assert verify_password(wrong_password, hashed) is False
 
@@ -45,11 +44,11 @@ class TestPasswordHashing:
 class TestUserAuthentication:
     """Test user authentication logic."""
     
-    def setup_method(self):
-        """Setup test data before each test."""
-        # Clear and reinitialize users for each test
+    @pytest.fixture(autouse=True)
+    def _default_users(self, default_users_snapshot):
+        """Reset USERS_DB to the default users before each test (no re-hashing)."""
         USERS_DB.clear()
-        initialize_default_users()
+        USERS_DB.update({username: dict(data) for username, data in default_users_snapshot.items()})
     
     def test_authenticate_user_success_admin(self):
         """Test successful authentication for admin user."""
@@ -83,14 +82,14 @@ class TestUserAuthentication:
         user = authenticate_user("nonexistent", "password")
         assert user is None
     
-    def test_authenticate_user_inactive_user(self):
+    def test_authenticate_user_inactive_user(self, hashed_password123):
         """Test authentication with inactive user."""
         # Create an inactive user
         USERS_DB["inactive_user"] = {
             "username": "inactive_user",
             "email": "inactive@example.com",
             "full_name": "Inactive User",
-            "hashed_password": get_password_hash("password123"),
+            "hashed_password": hashed_password123,
             "is_active": False,
             "role": "user"
         }
@@ -102,13 +101,11 @@ class TestUserAuthentication:
 class TestTokenCreation:
     """Test JWT token creation."""
     
-    def test_create_access_token(self):
+    def test_create_access_token(self, testuser_access_token):
         """Test access token creation."""
-        token = create_access_token(data={"sub": "testuser"})
-        
-        assert token is not None
-        assert isinstance(token, str)
-        assert len(token) > 0
+        assert testuser_access_token is not None
+        assert isinstance(testuser_access_token, str)
+        assert len(testuser_access_token) > 0
     
     def test_create_access_token_with_expiration(self):
         """Test access token creation with custom expiration."""
@@ -122,11 +119,14 @@ class TestTokenCreation:
 class TestDefaultUserInitialization:
     """Test default user initialization."""
     
-    def test_initialize_default_users(self):
-        """Test that default users are properly initialized."""
+    @pytest.fixture(scope="class", autouse=True)
+    def init_users(self):
+        """Clear USERS_DB and run initialize_default_users() once for the class."""
         USERS_DB.clear()
         initialize_default_users()
-        
+    
+    def test_initialize_default_users(self):
+        """Test that default users are properly initialized."""
         # Check that both default users exist
         assert "admin" in USERS_DB
         assert "user" in USERS_DB
@@ -151,9 +151,6 @@ class TestDefaultUserInitialization:
     
     def test_default_users_can_authenticate(self):
         """Test that default users can authenticate with correct passwords."""
-        USERS_DB.clear()
-        initialize_default_users()
-        
         # Test admin authentication
         admin_user = authenticate_user("admin", "admin123")
         assert admin_user is not None
@@ -166,9 +163,6 @@ class TestDefaultUserInitialization:
     
     def test_default_users_cannot_authenticate_with_wrong_passwords(self):
         """Test that default users cannot authenticate with wrong passwords."""
-        USERS_DB.clear()
-        initialize_default_users()
-        
         # Test admin with wrong password
         admin_user = authenticate_user("admin", "wrongpassword")
         assert admin_user is None
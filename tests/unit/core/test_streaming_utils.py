@@ -67,7 +67,7 @@ class TestSha1U64Function:
 class TestEmbedOllamaFunction:
     """Test the embed_ollama utility function."""
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_embed_ollama_success(self, mock_post):
         """Test successful embed_ollama call."""
         # Mock the response
@@ -86,7 +86,38 @@ class TestEmbedOllamaFunction:
         assert len(result) == 100
         assert np.allclose(np.linalg.norm(result), 1.0, atol=1e-6)  # Should be normalized
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
+    def test_embed_ollama_caches_repeat_text(self, mock_post):
+        """Test that a repeated text is served from the cache as a read-only array."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {"embedding": [3.0, 4.0]}
+        mock_post.return_value = mock_response
+        
+        first = embed_ollama("test text")
+        second = embed_ollama("test text")
+        
+        assert second is first
+        assert mock_post.call_count == 1
+        assert not first.flags.writeable
+    
+    @patch('src.main.ollama_session.post')
+    def test_embed_ollama_cache_is_per_ollama_url(self, mock_post, monkeypatch):
+        """Test that the same model and text on another Ollama host is not a cache hit."""
+        from src.main import settings
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {"embedding": [3.0, 4.0]}
+        mock_post.return_value = mock_response
+        
+        embed_ollama("test text")
+        monkeypatch.setattr(settings, "ollama_url", "http://other-ollama:11434")
+        embed_ollama("test text")
+        
+        assert mock_post.call_count == 2
+        assert mock_post.call_args.args[0] == "http://other-ollama:11434/api/embeddings"
+    
+    @patch('src.main.ollama_session.post')
     def test_embed_ollama_http_error(self, mock_post):
         """Test embed_ollama with HTTP error."""
         mock_response = Mock()
@@ -96,7 +127,7 @@ class TestEmbedOllamaFunction:
         with pytest.raises(requests.HTTPError):
             embed_ollama("test text")
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_embed_ollama_network_error(self, mock_post):
         """Test embed_ollama with network error."""
         mock_post.side_effect = requests.ConnectionError("Connection failed")
@@ -104,7 +135,7 @@ class TestEmbedOllamaFunction:
         with pytest.raises(requests.ConnectionError):
             embed_ollama("test text")
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_embed_ollama_empty_embedding(self, mock_post):
         """Test embed_ollama with empty embedding response."""
         mock_response = Mock()
@@ -119,7 +150,7 @@ class TestEmbedOllamaFunction:
         assert isinstance(result, np.ndarray)
         assert len(result) == 0
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_embed_ollama_normalization(self, mock_post):
         """Test that embed_ollama properly normalizes vectors."""
         # Create a non-normalized embedding
@@ -167,7 +198,7 @@ class TestSysPromptConstant:
 class TestStreamAnswerFunction:
     """Test the stream_answer function in detail."""
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_basic_streaming(self, mock_post):
         """Test basic streaming functionality."""
         # Mock the streaming response
@@ -191,7 +222,7 @@ class TestStreamAnswerFunction:
         assert result[1] == b" world"
         assert result[2] == b"!"
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_context_formatting(self, mock_post):
         """Test that context is properly formatted in the prompt."""
         mock_response = Mock()
@@ -228,7 +259,7 @@ class TestStreamAnswerFunction:
         # Should contain the instruction
         assert "Please provide a helpful and informative answer:" in prompt
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_context_without_doc_path(self, mock_post):
         """Test context formatting when doc_path is missing."""
         mock_response = Mock()
@@ -252,7 +283,7 @@ class TestStreamAnswerFunction:
         assert "Test context" in prompt
         assert "From" not in prompt
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_handles_json_errors(self, mock_post):
         """Test that stream_answer handles JSON parsing errors."""
         mock_response = Mock()
@@ -275,7 +306,7 @@ class TestStreamAnswerFunction:
         assert result[0] == b"Valid"
         assert result[1] == b"Another valid"
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_handles_empty_responses(self, mock_post):
         """Test that stream_answer handles empty response fields."""
         mock_response = Mock()
@@ -297,7 +328,7 @@ class TestStreamAnswerFunction:
         assert len(result) == 1
         assert result[0] == b"Valid response"
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_http_error(self, mock_post):
         """Test that stream_answer handles HTTP errors."""
         mock_response = Mock()
@@ -310,7 +341,7 @@ class TestStreamAnswerFunction:
         with pytest.raises(requests.HTTPError):
             list(stream_answer(query, ctx_blocks))
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_network_error(self, mock_post):
         """Test that stream_answer handles network errors."""
         mock_post.side_effect = requests.ConnectionError("Connection failed")
@@ -321,7 +352,7 @@ class TestStreamAnswerFunction:
         with pytest.raises(requests.ConnectionError):
             list(stream_answer(query, ctx_blocks))
     
-    @patch('src.main.requests.post')
+    @patch('src.main.ollama_session.post')
     def test_stream_answer_request_parameters(self, mock_post):
         """Test that stream_answer makes the request with correct parameters."""
         mock_response = Mock()
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
+import hashlib
 import tempfile
 import os
 from pathlib import Path
@@ -139,6 +140,8 @@ class TestDocumentService:
         result = self.service.sha1_u64("test text")
         assert isinstance(result, int)
         assert result > 0
+        # Point IDs must stay stable across releases so re-indexing upserts in place
+        assert result == int.from_bytes(hashlib.sha1(b"test text").digest()[:8], "big")
 
     def test_chunk_words(self):
         """Test text chunking"""